@@ -4,7 +4,12 @@ import plotly.io as pio
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+import os
+import tempfile
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pydeck as pdk
 
 corporate_template = go.layout.Template(
     layout=go.Layout(
@@ -144,51 +149,418 @@ with col2:
     st.image('logo.png', width=100)  # Adjust the width value to make it smaller
 
 
-# Load data
-@st.cache_data
-def load_data():
-    # This would normally read from a CSV file, but for this example we'll input the data manually
-    data = pd.read_csv("data.csv")
+# Version of the cleaned data layout stored in data.parquet. Bump it whenever build_parquet
+# adds, removes or retypes a column, so existing Parquet copies are rebuilt.
+DATA_VERSION = b'2'
 
-    # Clean and process the data
-    # Convert contract date to datetime
-    data['Contract Date'] = pd.to_datetime(data['Contract Date'], dayfirst=True)
 
-    # Clean and convert m² column
-    data['m²'] = pd.to_numeric(data['m²'].str.replace(',', ''), errors='coerce')
+# Clean the raw CSV data and save it as Parquet, so later cold starts skip parsing and cleaning
+def build_parquet():
+    # This would normally read from a CSV file, but for this example we'll input the data manually
+    # Dates, thousands separators and numeric types are all handled by the parser in one pass
+    data = pd.read_csv(
+        "data.csv",
+        thousands=',',
+        parse_dates=['Contract Date'],
+        dayfirst=True,
+        dtype={'Contract Amount': 'float64'}
+    )
 
-    # Convert contract amount to numeric
-    data['Contract Amount'] = data['Contract Amount'].str.replace(',', '').astype(float)
+    # Clean and convert m² column; placeholders such as 'TBC' become missing instead of failing the load.
+    # A column holding such a placeholder is read as text and keeps its thousands separators.
+    if not pd.api.types.is_numeric_dtype(data['m²']):
+        data['m²'] = data['m²'].str.replace(',', '')
+    data['m²'] = pd.to_numeric(data['m²'], errors='coerce')
 
     # Replace missing values in areas with 0
-    for col in ['Covered Area', 'Covered Veranda', 'Total Covered']:
-        data[col] = data[col].fillna(0)
+    areas = ['Covered Area', 'Covered Veranda', 'Total Covered']
+    data[areas] = data[areas].fillna(0)
+
+    # Parse bedroom counts once; non-numeric values such as 'Penthouse' become missing
+    bedroom_counts = pd.to_numeric(data['Bedrooms'], errors='coerce')
+    data['_bedrooms_num'] = bedroom_counts.astype('Int8')
+    data['_bedrooms_ok'] = bedroom_counts.notna().to_numpy()
+
+    # Rows without a contract date never match the date filters, so leave them out before
+    # deriving the integer month key
+    data = data.dropna(subset=['Contract Date'])
+
+    # Add an integer YYYYMM column for timeline analysis
+    contract_dates = data['Contract Date'].dt
+    data['YearMonth'] = (contract_dates.year * 100 + contract_dates.month).astype('int32')
+
+    # Sort by contract date so date filters can binary search instead of scanning
+    data = data.sort_values('Contract Date', kind='stable').reset_index(drop=True)
 
-    # Add a Year-Month column for timeline analysis
-    data['Year-Month'] = data['Contract Date'].dt.strftime('%Y-%m')
+    # Store repeated labels as categories so filters and groupbys work on integer codes
+    for col in ['Project', 'Bedrooms', 'Market Segment']:
+        data[col] = data[col].astype('category')
+
+    # Amounts, areas and coordinates fit in float32, which halves the memory every filter and groupby reads
+    for col in ['Contract Amount', 'Covered Area', 'Covered Veranda', 'Total Covered', 'Latitude', 'Longitude']:
+        data[col] = data[col].astype('float32')
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b'data_version': DATA_VERSION})
+
+    # Write to a temporary file and move it into place, so an interrupted write never leaves a
+    # truncated data.parquet behind
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=".", prefix="data.", suffix=".parquet.tmp")
+        os.close(fd)
+        pq.write_table(table, temp_path, compression='zstd')
+        os.replace(temp_path, "data.parquet")
+    except OSError:
+        # Read-only deployments just use the freshly cleaned data
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
 
     return data
 
+
+# The Parquet copy is usable if it is newer than data.csv and was written by this data version
+def parquet_is_current():
+    if not os.path.exists("data.parquet") or os.path.getmtime("data.parquet") < os.path.getmtime("data.csv"):
+        return False
+
+    try:
+        metadata = pq.read_schema("data.parquet").metadata or {}
+    except pa.ArrowInvalid:
+        # Unreadable, for example truncated by an interrupted write
+        return False
+
+    return metadata.get(b'data_version') == DATA_VERSION
+
+
+# Load data, rebuilding the Parquet copy whenever it is stale
+@st.cache_data
+def load_data():
+    if not parquet_is_current():
+        return build_parquet()
+
+    return pq.read_table("data.parquet", memory_map=True).to_pandas()
+
+
+# Running sales totals over the date-sorted rows plus the row where each month starts, so
+# unfiltered monthly sales for any date range can be read off without grouping
+@st.cache_data
+def load_monthly_totals():
+    data = load_data()
+    year_month = data['YearMonth'].to_numpy()
+    amounts = data['Contract Amount'].to_numpy()
+
+    month_starts = np.flatnonzero(np.r_[True, year_month[1:] != year_month[:-1]])
+    months = year_month[month_starts]
+    month_bounds = np.append(month_starts, len(data))
+    totals_cum = np.concatenate([[0], amounts.cumsum(dtype='float64')])
+    return months, month_bounds, totals_cum, amounts.min(), amounts.max()
+
+
 data = load_data()
 
 
+# Format integer YYYYMM keys as 'YYYY-MM' labels
+def year_month_labels(year_month):
+    return [f"{value // 100:04d}-{value % 100:02d}" for value in year_month]
+
+
+# Compare the integer category codes instead of the labels themselves
+def category_mask(column, value):
+    return column.cat.codes.to_numpy() == column.cat.categories.get_loc(value)
+
+
+# Rows are sorted by contract date, so a date range is a contiguous slice of rows
+def date_range_rows(data, start_date, end_date):
+    return np.searchsorted(
+        data["Contract Date"].to_numpy(),
+        [np.datetime64(start_date), np.datetime64(end_date) + 1]
+    )
+
+
+# Apply filters once per selection and share the matching row positions between all aggregations.
+# The leading underscore keeps Streamlit from hashing the full data frame on every call.
+@st.cache_data
+def filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    lo, hi = date_range_rows(_data, start_date, end_date)
+    data = _data.iloc[lo:hi]
+
+    # Combine the remaining predicates in place on a single boolean array
+    amounts = data["Contract Amount"].to_numpy()
+    mask = np.greater_equal(amounts, min_price)
+    np.logical_and(mask, amounts <= max_price, out=mask)
+
+    if project != "All":
+        np.logical_and(mask, category_mask(data["Project"], project), out=mask)
+
+    if bedrooms != "All":
+        np.logical_and(mask, category_mask(data["Bedrooms"], bedrooms), out=mask)
+
+    if segment != "All":
+        np.logical_and(mask, category_mask(data["Market Segment"], segment), out=mask)
+
+    return lo + np.flatnonzero(mask)
+
+
+# Take only the columns an aggregation reads for the matching rows, not the whole row
+def take_columns(data, rows, columns):
+    return data.iloc[rows, data.columns.get_indexer(columns)]
+
+
+# Total, average and count of sales plus average size for each group. Each statistic is a
+# single bincount over integer group codes rather than a hash-based groupby. Only groups
+# present in the data get a row; pass sort=False when the caller reorders the result anyway.
+def sales_summary(data, key, sort=True):
+    codes, groups = pd.factorize(data[key], sort=sort)
+
+    # Rows with a missing key are left out, as groupby does
+    present = codes >= 0
+    codes = codes[present]
+
+    units_sold = np.bincount(codes, minlength=len(groups))
+    total_sales = np.bincount(codes, weights=data['Contract Amount'].to_numpy()[present], minlength=len(groups))
+    total_size = np.bincount(codes, weights=data['Total Covered'].to_numpy()[present], minlength=len(groups))
+    average_price = total_sales / units_sold
+    average_size = total_size / units_sold
+
+    return pd.DataFrame({
+        key: groups,
+        'Total Sales': total_sales,
+        'Average Price': average_price,
+        'Units Sold': units_sold,
+        'Average Size': average_size,
+        'Price per m²': np.divide(average_price, average_size, out=np.full_like(average_price, np.nan),
+                                  where=average_size > 0)
+    })
+
+
+# Cached aggregations, keyed on the filter values
+@st.cache_data
+def compute_filtered_data(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+
+    # Only the columns shown in the transaction details
+    return take_columns(_data, rows, ['Project', 'Unit ID', 'Contract Date', 'Contract Amount', 'm²'])
+
+
+@st.cache_data
+def compute_monthly_sales(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    months, month_bounds, totals_cum, lowest_price, highest_price = load_monthly_totals()
+
+    full_price_range = min_price <= lowest_price and max_price >= highest_price
+
+    if (project, bedrooms, segment) == ("All", "All", "All") and full_price_range:
+        # Only the date range applies, so take the monthly sums from the running totals
+        lo, hi = date_range_rows(_data, start_date, end_date)
+        first = np.searchsorted(month_bounds, lo, side='right') - 1
+        last = np.searchsorted(month_bounds, hi, side='left')
+        bounds = np.clip(month_bounds[first:last + 1], lo, hi) if lo < hi else np.array([lo])
+
+        monthly_sales = pd.DataFrame({
+            'YearMonth': months[first:first + len(bounds) - 1],
+            'Contract Amount': totals_cum[bounds[1:]] - totals_cum[bounds[:-1]],
+            'Unit ID': np.diff(bounds)
+        })
+    else:
+        rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+
+        # Aggregate sales by month for timeline. Rows are date-sorted, so each row's month is
+        # found from the month boundaries and summed and counted with one bincount each.
+        month_codes = np.searchsorted(month_bounds, rows, side='right') - 1
+        amounts = _data['Contract Amount'].to_numpy()[rows]
+        totals = np.bincount(month_codes, weights=amounts, minlength=len(months))
+        counts = np.bincount(month_codes, minlength=len(months))
+        sold = counts > 0
+
+        monthly_sales = pd.DataFrame({
+            'YearMonth': months[sold],
+            'Contract Amount': totals[sold],
+            'Unit ID': counts[sold]
+        })
+
+    # Label only the aggregated months, not every row
+    monthly_sales['Year-Month'] = year_month_labels(monthly_sales['YearMonth'])
+    return monthly_sales
+
+
+@st.cache_data
+def compute_project_sales(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+    filtered_data = take_columns(_data, rows, ['Project', 'Contract Amount', 'Total Covered'])
+
+    # Sales by project
+    project_sales = sales_summary(filtered_data, 'Project', sort=False)
+
+    # Sort projects by total sales
+    return project_sales.sort_values('Total Sales', ascending=False)
+
+
+@st.cache_data
+def compute_bedroom_sales(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+    filtered_data = take_columns(_data, rows, ['_bedrooms_num', '_bedrooms_ok', 'Contract Amount', 'Total Covered'])
+
+    # Filter out any rows with non-numeric bedroom values
+    bedroom_data = filtered_data[filtered_data['_bedrooms_ok']]
+
+    # Sales by bedroom count, labelled as text so the charts keep treating them as categories
+    bedroom_sales = sales_summary(bedroom_data, '_bedrooms_num')
+    bedroom_sales.insert(0, 'Bedrooms', bedroom_sales.pop('_bedrooms_num').astype(str))
+    return bedroom_sales
+
+
+@st.cache_data
+def compute_monthly_price_m2(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+    filtered_data = take_columns(_data, rows, ['YearMonth', 'm²'])
+
+    # Create monthly average price per m²
+    monthly_price_m2 = filtered_data.groupby('YearMonth')['m²'].mean()
+    return pd.DataFrame({
+        'Month': year_month_labels(monthly_price_m2.index),
+        'Price per m²': monthly_price_m2.to_numpy()
+    })
+
+
+@st.cache_data
+def compute_project_locations(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price):
+    rows = filter_rows(_data, start_date, end_date, project, bedrooms, segment, min_price, max_price)
+    filtered_data = take_columns(_data, rows, ['Project', 'Latitude', 'Longitude', 'Contract Amount'])
+
+    # Filter out rows with missing lat/long; sum amounts in float64 so project totals stay exact
+    map_data = filtered_data.dropna(subset=['Latitude', 'Longitude']).astype({'Contract Amount': 'float64'})
+
+    # Group by project and get average coordinates and total sales
+    project_locations = map_data.groupby('Project', observed=True).agg({
+        'Latitude': 'mean',
+        'Longitude': 'mean',
+        'Contract Amount': ['sum', 'count']
+    }).reset_index()
+
+    project_locations.columns = ['Project', 'Latitude', 'Longitude', 'Total Sales', 'Units Sold']
+    project_locations['size'] = np.sqrt(project_locations['Total Sales']) / 100
+
+    # Format total sales values with commas for hover data
+    project_locations['Total Sales (Euro)'] = project_locations['Total Sales'].apply(
+        lambda x: f"{x:,.2f} €")
+    return project_locations
+
+
+# Cached chart builders. Each returns the figure as a plain dict so reruns with
+# unchanged aggregates skip building the figure again.
+@st.cache_data
+def build_monthly_bar(monthly_sales):
+    fig = go.Figure(go.Bar(
+        x=monthly_sales['Year-Month'].to_numpy(),
+        y=monthly_sales['Contract Amount'].to_numpy(),
+        texttemplate='%{y:.2s}'
+    ))
+    fig.update_layout(
+        title='Monthly Sales Volume',
+        xaxis_title='Month',
+        yaxis_title='Total Sales (€)',
+        xaxis_tickangle=-45,
+        height=500,
+        template=corporate_template
+    )
+    return fig.to_dict()
+
+
+@st.cache_data
+def build_monthly_units_line(monthly_sales):
+    fig = go.Figure(go.Scatter(
+        x=monthly_sales['Year-Month'].to_numpy(),
+        y=monthly_sales['Unit ID'].to_numpy(),
+        mode='lines+markers'
+    ))
+    fig.update_layout(
+        title='Number of Units Sold Monthly',
+        xaxis_title='Month',
+        yaxis_title='Units Sold',
+        xaxis_tickangle=-45,
+        height=400,
+        template=corporate_template
+    )
+    return fig.to_dict()
+
+
+@st.cache_data
+def build_project_bar(project_sales, column, title, axis_title, height):
+    fig = go.Figure(go.Bar(
+        y=project_sales['Project'].to_numpy(),
+        x=project_sales[column].to_numpy(),
+        texttemplate='%{x:.2s}',
+        orientation='h'
+    ))
+    fig.update_layout(title=title, xaxis_title=axis_title, height=height)
+    return fig.to_dict()
+
+
+@st.cache_data
+def build_bedroom_pie(bedroom_sales):
+    fig = go.Figure(go.Pie(
+        values=bedroom_sales['Units Sold'].to_numpy(),
+        labels=bedroom_sales['Bedrooms'].to_numpy(),
+        hole=0.4,
+        textinfo='percent+label'
+    ))
+    fig.update_layout(title='Units Sold by Bedroom Count')
+    return fig.to_dict()
+
+
+@st.cache_data
+def build_bedroom_bar(bedroom_sales):
+    fig = go.Figure(go.Bar(
+        x=bedroom_sales['Bedrooms'].to_numpy(),
+        y=bedroom_sales['Average Price'].to_numpy(),
+        texttemplate='%{y:.2s}'
+    ))
+    fig.update_layout(
+        title='Average Price by Bedroom Count',
+        xaxis_title='Bedrooms',
+        yaxis_title='Average Price'
+    )
+    return fig.to_dict()
+
+
+@st.cache_data
+def build_price_m2_line(monthly_price_m2):
+    fig = go.Figure(go.Scatter(
+        x=monthly_price_m2['Month'].to_numpy(),
+        y=monthly_price_m2['Price per m²'].to_numpy(),
+        mode='lines+markers'
+    ))
+
+    # Customize the layout
+    fig.update_layout(
+        title='Average Price per m² Over Time',
+        xaxis_title="Month",
+        yaxis_title="Price (€/m²)",
+        hovermode='x unified'
+    )
+
+    # Update y-axis to show values in euros
+    fig.update_layout(yaxis=dict(tickprefix="€"))
+    return fig.to_dict()
+
+
 # Add a sidebar with filters
 with st.sidebar:
     st.header("Filters")
 
-    # Date range filter
-    min_date = data['Contract Date'].min().date()
-    max_date = data['Contract Date'].max().date()
+    # Date range filter, bounded by the first and last rows of the date-sorted data
+    min_date = data['Contract Date'].iloc[0].date()
+    max_date = data['Contract Date'].iloc[-1].date()
 
     start_date = st.date_input("Start Date", min_date, min_value=min_date, max_value=max_date)
     end_date = st.date_input("End Date", max_date, min_value=min_date, max_value=max_date)
 
     # Project filter
-    projects = ["All"] + sorted(data["Project"].unique().tolist())
+    projects = ["All"] + data["Project"].cat.categories.tolist()
     selected_project = st.selectbox("Select Project", projects)
 
     # Bedroom filter
-    bedrooms = ["All"] + sorted(data["Bedrooms"].dropna().unique().tolist())
+    bedrooms = ["All"] + data["Bedrooms"].cat.categories.tolist()
     selected_bedrooms = st.selectbox("Select Bedrooms", bedrooms)
 
     # Price range filter
@@ -201,38 +573,18 @@ with st.sidebar:
         (min_price, max_price)
     )
     # Market segment filter
-    segments = ["All"] + sorted(data["Market Segment"].unique().tolist())
+    segments = ["All"] + data["Market Segment"].cat.categories.tolist()
     selected_segment = st.selectbox("Select Market Segment", segments)
 
 # Apply filters
-filter_conditions = (
-        (data["Contract Date"].dt.date >= start_date) &
-        (data["Contract Date"].dt.date <= end_date) &
-        (data["Contract Amount"] >= price_range[0]) &
-        (data["Contract Amount"] <= price_range[1])
-)
-
-if selected_project != "All":
-    filter_conditions &= (data["Project"] == selected_project)
-
-if selected_bedrooms != "All":
-    filter_conditions &= (data["Bedrooms"] == selected_bedrooms)
+filters = (start_date, end_date, selected_project, selected_bedrooms, selected_segment, *price_range)
 
-if selected_segment != "All":
-    filter_conditions &= (data["Market Segment"] == selected_segment)
+filtered_data = compute_filtered_data(data, *filters)
 
-filtered_data = data[filter_conditions]
-
-# Check the type and handle conversion safely
-if pd.api.types.is_string_dtype(filtered_data['m²']):
-    # If it's string type, remove commas and convert to float
-    filtered_data['m²'] = filtered_data['m²'].str.replace(',', '').astype(float)
-elif pd.api.types.is_numeric_dtype(filtered_data['m²']):
-    # If it's already numeric, just ensure it's float type
-    filtered_data['m²'] = filtered_data['m²'].astype(float)
-else:
-    # Handle any other case
-    st.error("Unexpected data type in m² column")
+# Show message and stop if no data after filtering, before any tab is rendered
+if filtered_data.empty:
+    st.warning("No data available for the selected filters. Please adjust your filter criteria.")
+    st.stop()
 
 # Create tabs for different dashboard sections
 tab1, tab2, tab3 = st.tabs(["Sales Timeline", "Project Analysis", "Location Map"])
@@ -240,39 +592,14 @@ tab1, tab2, tab3 = st.tabs(["Sales Timeline", "Project Analysis", "Location Map"
 with tab1:
     st.header("Sales Timeline")
 
-    # Show message if no data after filtering
-    if filtered_data.empty:
-        st.warning("No data available for the selected filters. Please adjust your filter criteria.")
-    else:
-        # Aggregate sales by month for timeline
-        monthly_sales = filtered_data.groupby('Year-Month').agg(
-            {'Contract Amount': 'sum', 'Unit ID': 'count'}
-        ).reset_index()
-        monthly_sales = monthly_sales.sort_values('Year-Month')
-
-        # Create timeline chart
-        fig = px.bar(
-            monthly_sales,
-            x='Year-Month',
-            y='Contract Amount',
-            title='Monthly Sales Volume',
-            labels={'Year-Month': 'Month', 'Contract Amount': 'Total Sales (€)'},
-            text_auto='.2s'
-        )
-        fig.update_layout(xaxis_tickangle=-45, height=500, template=corporate_template)
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Line chart for number of units sold
-        fig2 = px.line(
-            monthly_sales,
-            x='Year-Month',
-            y='Unit ID',
-            title='Number of Units Sold Monthly',
-            labels={'Year-Month': 'Month', 'Unit ID': 'Units Sold'},
-            markers=True
-        )
-        fig2.update_layout(xaxis_tickangle=-45, height=400, template=corporate_template)
-        st.plotly_chart(fig2, use_container_width=True)
+    # Aggregate sales by month for timeline
+    monthly_sales = compute_monthly_sales(data, *filters)
+
+    # Create timeline chart
+    st.plotly_chart(go.Figure(build_monthly_bar(monthly_sales)), use_container_width=True)
+
+    # Line chart for number of units sold
+    st.plotly_chart(go.Figure(build_monthly_units_line(monthly_sales)), use_container_width=True)
 
 with tab2:
     st.header("Project Analysis")
@@ -281,258 +608,163 @@ with tab2:
 
     # Calculate statistics
     try:
-        if not filtered_data.empty:
-            # Remove rows with NaN values in the 'm²' column before finding max/min
-            valid_data = filtered_data.dropna(subset=['m²'])
-
-            if not valid_data.empty:
-                highest_transaction = valid_data.loc[valid_data['m²'].idxmax()]
-                lowest_transaction = valid_data.loc[valid_data['m²'].idxmin()]
-                average_price_per_m2 = valid_data['m²'].mean()
-
-                # First show the summary statistics in big numbers
-                col1, col2, col3 = st.columns(3)
-
-                with col1:
-                    st.metric("Highest Price/m²", f"€{float(highest_transaction['m²']):,.2f}")
-
-                with col2:
-                    st.metric("Lowest Price/m²", f"€{float(lowest_transaction['m²']):,.2f}")
-
-                with col3:
-                    st.metric("Average Price/m²", f"€{average_price_per_m2:,.2f}")
-
-                # Then show the detailed transactions
-                st.subheader("Highest & Lowest Price per m² Transactions")
-
-                detail_col1, detail_col2 = st.columns(2)
-
-                with detail_col1:
-                    st.markdown("**Highest Price per m² Transaction**")
-                    st.write(f"Project: {highest_transaction['Project']}")
-                    st.write(f"Unit: {highest_transaction['Unit ID']}")
-                    st.write(f"Contract Amount: €{float(highest_transaction['Contract Amount']):,.2f}")
-                    st.write(f"Price per m²: €{float(highest_transaction['m²']):,.2f}")
-                    st.write(f"Date: {highest_transaction['Contract Date'].strftime('%d/%m/%Y')}")
-
-                with detail_col2:
-                    st.markdown("**Lowest Price per m² Transaction**")
-                    st.write(f"Project: {lowest_transaction['Project']}")
-                    st.write(f"Unit: {lowest_transaction['Unit ID']}")
-                    st.write(f"Contract Amount: €{float(lowest_transaction['Contract Amount']):,.2f}")
-                    st.write(f"Price per m²: €{float(lowest_transaction['m²']):,.2f}")
-                    st.write(f"Date: {lowest_transaction['Contract Date'].strftime('%d/%m/%Y')}")
-            else:
-                st.warning("No valid price per m² data available for the selected filters.")
+        # Remove rows with NaN values in the 'm²' column before finding max/min
+        valid_data = filtered_data.dropna(subset=['m²'])
+
+        if not valid_data.empty:
+            highest_transaction = valid_data.loc[valid_data['m²'].idxmax()]
+            lowest_transaction = valid_data.loc[valid_data['m²'].idxmin()]
+            average_price_per_m2 = valid_data['m²'].mean()
+
+            # First show the summary statistics in big numbers
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.metric("Highest Price/m²", f"€{float(highest_transaction['m²']):,.2f}")
+
+            with col2:
+                st.metric("Lowest Price/m²", f"€{float(lowest_transaction['m²']):,.2f}")
+
+            with col3:
+                st.metric("Average Price/m²", f"€{average_price_per_m2:,.2f}")
+
+            # Then show the detailed transactions
+            st.subheader("Highest & Lowest Price per m² Transactions")
+
+            detail_col1, detail_col2 = st.columns(2)
+
+            with detail_col1:
+                st.markdown("**Highest Price per m² Transaction**")
+                st.write(f"Project: {highest_transaction['Project']}")
+                st.write(f"Unit: {highest_transaction['Unit ID']}")
+                st.write(f"Contract Amount: €{float(highest_transaction['Contract Amount']):,.2f}")
+                st.write(f"Price per m²: €{float(highest_transaction['m²']):,.2f}")
+                st.write(f"Date: {highest_transaction['Contract Date'].strftime('%d/%m/%Y')}")
+
+            with detail_col2:
+                st.markdown("**Lowest Price per m² Transaction**")
+                st.write(f"Project: {lowest_transaction['Project']}")
+                st.write(f"Unit: {lowest_transaction['Unit ID']}")
+                st.write(f"Contract Amount: €{float(lowest_transaction['Contract Amount']):,.2f}")
+                st.write(f"Price per m²: €{float(lowest_transaction['m²']):,.2f}")
+                st.write(f"Date: {lowest_transaction['Contract Date'].strftime('%d/%m/%Y')}")
         else:
-            st.warning("No data available for the selected filters.")
+            st.warning("No valid price per m² data available for the selected filters.")
     except Exception as e:
         st.warning(f"Unable to display transaction details. Some data may be missing or invalid.")
 
-    # Show message if no data after filtering
-    if filtered_data.empty:
-        st.warning("No data available for the selected filters. Please adjust your filter criteria.")
-    else:
-        # Sales by project
-        project_sales = filtered_data.groupby('Project').agg(
-            {'Contract Amount': ['sum', 'mean', 'count'], 'Total Covered': 'mean'}
-        ).reset_index()
-        project_sales.columns = ['Project', 'Total Sales', 'Average Price', 'Units Sold', 'Average Size']
-        project_sales['Price per m²'] = project_sales['Average Price'] / project_sales['Average Size'].replace(0,
-                                                                                                               np.nan)
-
-        # Sort projects by total sales
-        project_sales = project_sales.sort_values('Total Sales', ascending=False)
-
-        # Create horizontal bar chart for total sales by project
-        fig3 = px.bar(
-            project_sales,
-            y='Project',
-            x='Total Sales',
-            title='Total Sales by Project',
-            labels={'Total Sales': 'Total Sales (€)', 'Project': ''},
-            text_auto='.2s',
-            orientation='h'
-        )
-        fig3.update_layout(height=600)
-        st.plotly_chart(fig3, use_container_width=True)
+    # Sales by project, sorted by total sales
+    project_sales = compute_project_sales(data, *filters)
 
-        # Two columns for price metrics
-        col1, col2 = st.columns(2)
+    # Create horizontal bar chart for total sales by project
+    fig3 = build_project_bar(project_sales, 'Total Sales', 'Total Sales by Project', 'Total Sales (€)', 600)
+    st.plotly_chart(go.Figure(fig3), use_container_width=True)
 
-        with col1:
-            # Average price by project
-            fig4 = px.bar(
-                project_sales,
-                y='Project',
-                x='Average Price',
-                title='Average Unit Price by Project',
-                labels={'Average Price': 'Average Price (€)', 'Project': ''},
-                text_auto='.2s',
-                orientation='h'
-            )
-            fig4.update_layout(height=500)
-            st.plotly_chart(fig4, use_container_width=True)
+    # Two columns for price metrics
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Average price by project
+        fig4 = build_project_bar(project_sales, 'Average Price', 'Average Unit Price by Project',
+                                 'Average Price (€)', 500)
+        st.plotly_chart(go.Figure(fig4), use_container_width=True)
+
+    with col2:
+        # Price per m² by project
+        fig5 = build_project_bar(project_sales, 'Price per m²', 'Average Price per m² by Project',
+                                 'Price per m² (€)', 500)
+        st.plotly_chart(go.Figure(fig5), use_container_width=True)
+
+    # Bedroom analysis
+    st.subheader("Sales by Number of Bedrooms")
+
+    # Sales by bedroom count, numeric bedroom values only
+    bedroom_sales = compute_bedroom_sales(data, *filters)
 
+    if not bedroom_sales.empty:
+        # Pie chart for bedroom distribution and bar chart for average price by bedroom
+        fig6 = build_bedroom_pie(bedroom_sales)
+        fig7 = build_bedroom_bar(bedroom_sales)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(go.Figure(fig6), use_container_width=True)
         with col2:
-            # Price per m² by project
-            fig5 = px.bar(
-                project_sales,
-                y='Project',
-                x='Price per m²',
-                title='Average Price per m² by Project',
-                labels={'Price per m²': 'Price per m² (€)', 'Project': ''},
-                text_auto='.2s',
-                orientation='h'
-            )
-            fig5.update_layout(height=500)
-            st.plotly_chart(fig5, use_container_width=True)
-
-        # Bedroom analysis
-        st.subheader("Sales by Number of Bedrooms")
-
-        # Filter out any rows with non-numeric bedroom values
-        bedroom_data = filtered_data[pd.to_numeric(filtered_data['Bedrooms'], errors='coerce').notna()]
-
-        if not bedroom_data.empty:
-            # Sales by bedroom count
-            bedroom_sales = bedroom_data.groupby('Bedrooms').agg(
-                {'Contract Amount': ['sum', 'mean', 'count'], 'Total Covered': 'mean'}
-            ).reset_index()
-            bedroom_sales.columns = ['Bedrooms', 'Total Sales', 'Average Price', 'Units Sold', 'Average Size']
-            bedroom_sales['Price per m²'] = bedroom_sales['Average Price'] / bedroom_sales['Average Size'].replace(0,
-                                                                                                                   np.nan)
-
-            # Create pie chart for bedroom distribution
-            fig6 = px.pie(
-                bedroom_sales,
-                values='Units Sold',
-                names='Bedrooms',
-                title='Units Sold by Bedroom Count',
-                hole=0.4
-            )
-            fig6.update_traces(textinfo='percent+label')
-
-            # Bar chart for average price by bedroom
-            fig7 = px.bar(
-                bedroom_sales,
-                x='Bedrooms',
-                y='Average Price',
-                title='Average Price by Bedroom Count',
-                text_auto='.2s'
-            )
-
-            col1, col2 = st.columns(2)
-            with col1:
-                st.plotly_chart(fig6, use_container_width=True)
-            with col2:
-                st.plotly_chart(fig7, use_container_width=True)
-        else:
-            st.info("No bedroom data available for the selected filters.")
-
-        # Create monthly average price per m²
-        monthly_price_m2 = filtered_data.groupby(pd.to_datetime(filtered_data['Contract Date']).dt.strftime('%Y-%m'))[
-            ['m²']].mean().reset_index()
-        monthly_price_m2.columns = ['Month', 'Price per m²']
-
-        # Create the figure
-        fig8 = px.line(monthly_price_m2,
-                       x='Month',
-                       y='Price per m²',
-                       title='Average Price per m² Over Time',
-                       markers=True)
-
-        # Customize the layout
-        fig8.update_layout(
-            xaxis_title="Month",
-            yaxis_title="Price (€/m²)",
-            hovermode='x unified'
-        )
+            st.plotly_chart(go.Figure(fig7), use_container_width=True)
+    else:
+        st.info("No bedroom data available for the selected filters.")
 
-        # Update y-axis to show values in euros
-        fig8.update_layout(yaxis=dict(tickprefix="€"))
+    # Create monthly average price per m²
+    monthly_price_m2 = compute_monthly_price_m2(data, *filters)
 
-        # Display the chart
-        st.plotly_chart(fig8, use_container_width=True)
+    # Create the figure and display the chart
+    st.plotly_chart(go.Figure(build_price_m2_line(monthly_price_m2)), use_container_width=True)
 
 with tab3:
     st.header("Sales Concentration by Project")
 
-    # Show message if no data after filtering
-    if filtered_data.empty:
-        st.warning("No data available for the selected filters. Please adjust your filter criteria.")
+    # Create a map with sales data points, aggregated per project
+    project_locations = compute_project_locations(data, *filters)
+
+    if not project_locations.empty:
+        # Custom location for analyzed plot
+        custom_latitude = 34.707233  # Replace with your location's latitude
+        custom_longitude = 33.053359  # Replace with your location's longitude
+
+        # Add a new row to project_locations to represent your plot
+        custom_plot = pd.DataFrame({
+            'Project': ['Agios Athanasios 419'],
+            'Latitude': [custom_latitude],
+            'Longitude': [custom_longitude],
+            'Total Sales': [0],  # No sales (specific to the plot)
+            'Units Sold': [0],  # No units
+            'Price per m²': [None],  # Non-applicable
+            'size': [10]  # Fixed marker size for visibility or adjust as needed
+        })
+
+        # Combine your plot with the existing project locations
+        all_locations = pd.concat([project_locations, custom_plot], ignore_index=True)
+
+        # Marker radius in pixels, scaled by area up to a 25 px diameter
+        sizes = all_locations['size'].to_numpy(dtype=float)
+        radius = 12.5 * np.sqrt(sizes / sizes.max())
+
+        # Colour each marker by total sales on the Plasma scale
+        total_sales = all_locations['Total Sales'].to_numpy(dtype=float)
+        colors = px.colors.sample_colorscale(px.colors.sequential.Plasma, total_sales / total_sales.max())
+
+        map_points = pd.DataFrame({
+            'project': all_locations['Project'].astype(str),
+            'latitude': all_locations['Latitude'].to_numpy(dtype=float),
+            'longitude': all_locations['Longitude'].to_numpy(dtype=float),
+            'total_sales': all_locations['Total Sales (Euro)'].fillna('-'),
+            'units_sold': all_locations['Units Sold'],
+            'radius': radius,
+            'color': [list(px.colors.unlabel_rgb(color)) for color in colors]
+        })
+
+        # Create the concentration map, drawn on the GPU by deck.gl
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            data=map_points,
+            get_position='[longitude, latitude]',
+            get_radius='radius',
+            radius_units='"pixels"',
+            get_fill_color='color',
+            opacity=0.8,
+            pickable=True
+        )
+        deck = pdk.Deck(
+            layers=[layer],
+            initial_view_state=pdk.ViewState(latitude=custom_latitude, longitude=custom_longitude, zoom=13),
+            map_style='light',
+            tooltip={'html': '<b>{project}</b><br/>Total Sales: {total_sales}<br/>Units Sold: {units_sold}'}
+        )
+
+        # Display the map
+        st.pydeck_chart(deck, use_container_width=True, height=600)
     else:
-        # Create a map with sales data points
-        # Filter out rows with missing lat/long
-        map_data = filtered_data.dropna(subset=['Latitude', 'Longitude'])
-
-        if not map_data.empty:
-            # Use a custom color scale based on contract amount
-            map_data['size'] = np.sqrt(map_data['Contract Amount']) / 100  # Scale the point size
-
-            # Custom location for analyzed plot
-            custom_latitude = 34.707233  # Replace with your location's latitude
-            custom_longitude = 33.053359  # Replace with your location's longitude
-
-            # Add a new row to project_locations to represent your plot
-            custom_plot = pd.DataFrame({
-                'Project': ['Agios Athanasios 419'],
-                'Latitude': [custom_latitude],
-                'Longitude': [custom_longitude],
-                'Total Sales': [0],  # No sales (specific to the plot)
-                'Units Sold': [0],  # No units
-                'Price per m²': [None],  # Non-applicable
-                'size': [10]  # Fixed marker size for visibility or adjust as needed
-            })
-
-            # Group by project and get average coordinates and total sales
-            project_locations = map_data.groupby('Project').agg({
-                'Latitude': 'mean',
-                'Longitude': 'mean',
-                'Contract Amount': ['sum', 'count']
-            }).reset_index()
-
-            project_locations.columns = ['Project', 'Latitude', 'Longitude', 'Total Sales', 'Units Sold']
-            project_locations['size'] = np.sqrt(project_locations['Total Sales']) / 100
-
-            # Format total sales values with commas for hover data
-            project_locations['Total Sales (Euro)'] = project_locations['Total Sales'].apply(
-                lambda x: f"{x:,.2f} €")
-
-            # Combine your plot with the existing project locations
-            all_locations = pd.concat([project_locations, custom_plot], ignore_index=True)
-
-            # Create the concentration map
-            fig9 = px.scatter_mapbox(
-                all_locations,
-                lat="Latitude",
-                lon="Longitude",
-                hover_name="Project",
-                hover_data={
-                    "Total Sales (Euro)": True,
-                    "Units Sold": True,
-                    "Latitude": False,
-                    "Longitude": False,
-                    "size": False
-                },
-                color="Total Sales",
-                size="size",
-                size_max=25,
-                zoom=13,
-                height=600,
-                color_continuous_scale=px.colors.sequential.Plasma
-            )
-
-            # Update map style
-            fig9.update_layout(
-                mapbox_style="open-street-map",
-                margin={"r": 0, "t": 0, "l": 0, "b": 0}
-            )
-
-            # Display the map
-            st.plotly_chart(fig9, use_container_width=True)
-        else:
-            st.info("No location data available for the selected filters.")
+        st.info("No location data available for the selected filters.")
 
 # Footer with disclaimer
 st.markdown("---")